@@ -1,29 +1,202 @@
+import gzip
+import heapq
 import json
 import sqlite3
-import shutil
+import sys
+import time
+import queue
 import random
+import threading
+import weakref
+import zlib
 from datetime import datetime, date, timedelta
 from http import HTTPStatus
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from functools import partial
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from itertools import islice
+from operator import itemgetter
 from urllib.parse import parse_qs, urlparse
 
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used when missing
+    orjson = None
+
 BASE_DIR = Path(__file__).resolve().parent
 TEMPLATES_DIR = BASE_DIR / 'templates'
 DB_PATH = BASE_DIR / 'habits_journal.db'
 DEFAULT_COLOR = '#000000'
 MIN_TARGET = 1
 MAX_TARGET = 21
+MAX_TIMELINE_LIMIT = 1000
+POOL_SIZE = 8
+# Smaller bodies are sent as-is; compressing them saves less than it costs
+GZIP_MIN_SIZE = 1024
+# Streamed bodies are written in pieces of roughly this many bytes
+STREAM_BATCH_SIZE = 16 * 1024
+# Local ISO-8601 timestamp computed by SQLite, for rows whose creation time is
+# never read back by the request that inserts them.
+SQL_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+
+
+class _Connection(sqlite3.Connection):
+    """Remembers the cursors opened through ``execute`` so the pool can close
+    any left partly read. A pending SELECT pins its WAL read snapshot, so the
+    next borrower would read stale data and its writes would fail with
+    "database is locked".
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors = weakref.WeakSet()
+
+    def execute(self, sql, parameters=()):
+        cursor = super().execute(sql, parameters)
+        self._cursors.add(cursor)
+        return cursor
+
+    def close_cursors(self):
+        for cursor in list(self._cursors):
+            cursor.close()
+        self._cursors.clear()
 
 
 def _connect():
-    conn = sqlite3.connect(str(DB_PATH))
+    # Pooled connections are handed between request threads, one at a time
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, factory=_Connection)
     conn.row_factory = sqlite3.Row
     conn.execute('PRAGMA foreign_keys = ON')
+    # Per-connection settings; WAL itself is persisted by _ensure_schema.
+    # NORMAL sync is safe under WAL and only fsyncs at checkpoints.
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    conn.execute('PRAGMA mmap_size = 268435456')
+    # ~20 MB page cache per pooled connection
+    conn.execute('PRAGMA cache_size = -20000')
     return conn
 
 
+class _ConnectionPool:
+    """Keeps up to ``size`` SQLite connections open for the life of the
+    process. Requests borrow one instead of reopening the database file (and
+    its -wal/-shm files) and re-running the connection PRAGMAs every time.
+    """
+
+    def __init__(self, size):
+        self._size = size
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def fill(self):
+        with self._lock:
+            while self._opened < self._size:
+                self._idle.put(_connect())
+                self._opened += 1
+
+    @contextmanager
+    def connection(self):
+        conn = self._borrow()
+        try:
+            yield conn
+        finally:
+            # Never hand the next borrower someone else's open statements or
+            # uncommitted writes
+            conn.close_cursors()
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def _borrow(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self._size:
+                self._opened += 1
+                return _connect()
+        return self._idle.get()
+
+
+_pool = _ConnectionPool(POOL_SIZE)
+
+
+def _get_conn():
+    return _pool.connection()
+
+
+# Changes whenever habit or journal data is written; GET responses derived
+# from that data carry it in their ETag. Seeded from the clock so tags handed
+# out by a previous process never match.
+_last_mutation = time.time_ns()
+
+
+def _mark_data_changed():
+    global _last_mutation
+    _last_mutation = time.time_ns()
+    _response_cache.clear()
+
+
+def _data_etag() -> str:
+    # Streaks and today's completion roll over at midnight without any write
+    return f'W/"{_last_mutation}-{date.today().isoformat()}"'
+
+
+# Encoded bodies of the habit and journal listings, keyed by endpoint, with
+# their gzipped form so cache hits are never recompressed. Writes clear the
+# cache outright; entries also expire after a short TTL and only answer
+# requests carrying the same data ETag they were built under.
+_CACHE_TTL = 2.0
+_response_cache = {}
+
+
+def _cached_response(key, etag):
+    """Return the cached ``(body, gzipped)`` pair for ``key``, or ``None``."""
+    entry = _response_cache.get(key)
+    if entry is None or entry[0] != etag or entry[3] < time.monotonic():
+        return None
+    return entry[1], entry[2]
+
+
+def _cache_response(key, etag, body: bytes):
+    """Cache ``body`` and return it as a ``(body, gzipped)`` pair; bodies
+    below GZIP_MIN_SIZE are always sent uncompressed and get ``None``.
+    """
+    compressed = gzip.compress(body, compresslevel=1) if len(body) >= GZIP_MIN_SIZE else None
+    _response_cache[key] = (etag, body, compressed, time.monotonic() + _CACHE_TTL)
+    return body, compressed
+
+
+def _dump_json(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+
+def _load_json(body: bytes):
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+    # handle both decoders the same way
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body.decode('utf-8'))
+
+
+@lru_cache(maxsize=1)
+def _index_page():
+    """Return the dashboard page as ``(raw, gzipped)`` bytes, or ``None`` when
+    the template is missing. The template only changes on deploy, so it is
+    read and compressed once per process.
+    """
+    index_path = TEMPLATES_DIR / 'index.html'
+    if not index_path.exists():
+        return None
+    content = index_path.read_bytes()
+    return content, gzip.compress(content)
+
+
 def _sanitize_target(value, default=7):
     try:
         target = int(value)
@@ -36,9 +209,98 @@ def _sanitize_target(value, default=7):
     return target
 
 
+def _migrate_v1(conn: sqlite3.Connection):
+    # Databases created before these columns existed
+    existing = {row['name'] for row in conn.execute('PRAGMA table_info(habit)')}
+    if 'target_per_week' not in existing:
+        conn.execute('ALTER TABLE habit ADD COLUMN target_per_week INTEGER NOT NULL DEFAULT 7')
+    if 'color' not in existing:
+        conn.execute('ALTER TABLE habit ADD COLUMN color TEXT NOT NULL DEFAULT "#000000"')
+    if 'last_completed' not in existing:
+        conn.execute('ALTER TABLE habit ADD COLUMN last_completed TEXT')
+    if 'best_streak' not in existing:
+        conn.execute('ALTER TABLE habit ADD COLUMN best_streak INTEGER NOT NULL DEFAULT 0')
+    if 'streak' not in existing:
+        conn.execute('ALTER TABLE habit ADD COLUMN streak INTEGER NOT NULL DEFAULT 0')
+    if 'completed' not in existing:
+        conn.execute('ALTER TABLE habit ADD COLUMN completed INTEGER NOT NULL DEFAULT 0')
+    if 'completed_days' not in existing:
+        conn.execute('ALTER TABLE habit ADD COLUMN completed_days INTEGER NOT NULL DEFAULT 0')
+    if 'score' not in existing:
+        conn.execute('ALTER TABLE habit ADD COLUMN score REAL NOT NULL DEFAULT 0.0')
+    if 'created_day' not in existing:
+        conn.execute('ALTER TABLE habit ADD COLUMN created_day TEXT')
+    conn.execute('UPDATE habit SET created_day = date(created_at) WHERE created_day IS NULL')
+
+    # Ensure target range sane
+    conn.execute(
+        'UPDATE habit SET target_per_week = ? '
+        'WHERE target_per_week IS NULL OR target_per_week < ? OR target_per_week > ?',
+        (7, MIN_TARGET, MAX_TARGET),
+    )
+
+    # Timeline pages are read newest-first from both tables
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_habit_created_at ON habit(created_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_journal_entry_timestamp ON journal_entry(timestamp)')
+
+
+def _migrate_v2(conn: sqlite3.Connection):
+    # Legacy rows stored 'YYYY-MM-DD HH:MM:SS' (or a bare date); rewrite them
+    # in the ISO-8601 form this app writes so reads never need a fallback.
+    for table, column in (
+        ('habit', 'created_at'),
+        ('habit_log', 'created_at'),
+        ('journal_entry', 'timestamp'),
+        ('ideal_self', 'created_at'),
+    ):
+        if column not in {row['name'] for row in conn.execute(f'PRAGMA table_info({table})')}:
+            continue
+        conn.execute(
+            f"UPDATE {table} SET {column} = CASE WHEN length({column}) = 10 "
+            f"THEN {column} || 'T00:00:00' ELSE replace({column}, ' ', 'T') END "
+            f"WHERE {column} NOT LIKE '%T%'"
+        )
+
+
+def _migrate_v3(conn: sqlite3.Connection):
+    # ideal_self used to gain a row per save; keep only the latest as row 1
+    columns = {row['name'] for row in conn.execute('PRAGMA table_info(ideal_self)')}
+    if 'updated_at' in columns:
+        return
+    conn.execute(
+        'CREATE TABLE ideal_self_single ('
+        'id INTEGER PRIMARY KEY CHECK (id = 1),'
+        'vision TEXT,'
+        'focus_areas TEXT,'
+        'updated_at TEXT NOT NULL'
+        ')'
+    )
+    conn.execute(
+        'INSERT INTO ideal_self_single (id, vision, focus_areas, updated_at) '
+        'SELECT 1, vision, focus_areas, created_at FROM ideal_self '
+        'ORDER BY created_at DESC, id DESC LIMIT 1'
+    )
+    conn.execute('DROP TABLE ideal_self')
+    conn.execute('ALTER TABLE ideal_self_single RENAME TO ideal_self')
+
+
+def _migrate_v4(conn: sqlite3.Connection):
+    # Every habit_log query filters on habit_id, which UNIQUE(habit_id, day)
+    # already indexes; a day-only index was pure write cost.
+    conn.execute('DROP INDEX IF EXISTS idx_habit_log_day')
+
+
+# Each entry brings the schema from version ``i`` to ``i + 1``; the version
+# reached is recorded in PRAGMA user_version so startup skips applied steps.
+_MIGRATIONS = [_migrate_v1, _migrate_v2, _migrate_v3, _migrate_v4]
+SCHEMA_VERSION = len(_MIGRATIONS)
+
+
 def _ensure_schema():
-    conn = _connect()
-    try:
+    with _get_conn() as conn:
+        # Stored in the database file, so setting it once covers every
+        # connection; lets readers proceed while a write is in flight.
+        conn.execute('PRAGMA journal_mode = WAL')
         conn.execute(
             'CREATE TABLE IF NOT EXISTS habit ('
             'id INTEGER PRIMARY KEY AUTOINCREMENT,'
@@ -46,6 +308,7 @@ def _ensure_schema():
             'score REAL NOT NULL DEFAULT 0.0,'
             'completed_days INTEGER NOT NULL DEFAULT 0,'
             'created_at TEXT NOT NULL,'
+            'created_day TEXT,'
             'completed INTEGER NOT NULL DEFAULT 0,'
             'streak INTEGER NOT NULL DEFAULT 0,'
             'best_streak INTEGER NOT NULL DEFAULT 0,'
@@ -71,43 +334,21 @@ def _ensure_schema():
             'timestamp TEXT NOT NULL'
             ')'
         )
+        # The vision is a single row that saves overwrite in place
         conn.execute(
             'CREATE TABLE IF NOT EXISTS ideal_self ('
-            'id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            'id INTEGER PRIMARY KEY CHECK (id = 1),'
             'vision TEXT,'
             'focus_areas TEXT,'
-            'created_at TEXT NOT NULL'
+            'updated_at TEXT NOT NULL'
             ')'
         )
 
-        # Lightweight migrations for legacy DBs
-        existing = {row['name'] for row in conn.execute('PRAGMA table_info(habit)')}
-        if 'target_per_week' not in existing:
-            conn.execute('ALTER TABLE habit ADD COLUMN target_per_week INTEGER NOT NULL DEFAULT 7')
-        if 'color' not in existing:
-            conn.execute('ALTER TABLE habit ADD COLUMN color TEXT NOT NULL DEFAULT "#000000"')
-        if 'last_completed' not in existing:
-            conn.execute('ALTER TABLE habit ADD COLUMN last_completed TEXT')
-        if 'best_streak' not in existing:
-            conn.execute('ALTER TABLE habit ADD COLUMN best_streak INTEGER NOT NULL DEFAULT 0')
-        if 'streak' not in existing:
-            conn.execute('ALTER TABLE habit ADD COLUMN streak INTEGER NOT NULL DEFAULT 0')
-        if 'completed' not in existing:
-            conn.execute('ALTER TABLE habit ADD COLUMN completed INTEGER NOT NULL DEFAULT 0')
-        if 'completed_days' not in existing:
-            conn.execute('ALTER TABLE habit ADD COLUMN completed_days INTEGER NOT NULL DEFAULT 0')
-        if 'score' not in existing:
-            conn.execute('ALTER TABLE habit ADD COLUMN score REAL NOT NULL DEFAULT 0.0')
-
-        # Ensure target range sane
-        conn.execute(
-            'UPDATE habit SET target_per_week = ? '
-            'WHERE target_per_week IS NULL OR target_per_week < ? OR target_per_week > ?',
-            (7, MIN_TARGET, MAX_TARGET),
-        )
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        for target_version, migrate in enumerate(_MIGRATIONS[version:], start=version + 1):
+            migrate(conn)
+            conn.execute(f'PRAGMA user_version = {target_version}')
         conn.commit()
-    finally:
-        conn.close()
 
 
 def _maybe_seed_demo_data(force: bool = False):
@@ -115,8 +356,7 @@ def _maybe_seed_demo_data(force: bool = False):
     content should be refreshed. This seeds habits with realistic logs, a
     vision, and a healthy number of journal entries so the UI looks full.
     """
-    conn = _connect()
-    try:
+    with _get_conn() as conn:
         # If there are very few habits, refresh demo content
         total = conn.execute('SELECT COUNT(*) AS c FROM habit').fetchone()['c']
         if not force and int(total or 0) > 5:
@@ -167,14 +407,16 @@ def _maybe_seed_demo_data(force: bool = False):
         for i, (name, target) in enumerate(defs):
             color = palette[i % len(palette)]
             created_ago = random.randint(90, 180)
-            created_at = (now - timedelta(days=created_ago)).isoformat()
+            created_at = now - timedelta(days=created_ago)
             cur = conn.execute(
-                'INSERT INTO habit (name, color, target_per_week, created_at) VALUES (?, ?, ?, ?)',
-                (name, color, _sanitize_target(target, target), created_at)
+                INSERT_HABIT_SQL,
+                (name, color, _sanitize_target(target, target), created_at.isoformat(),
+                 created_at.date().isoformat())
             )
             habit_ids.append((cur.lastrowid, name, target, created_ago))
 
         # Logs with realistic per-target patterns + mild randomness
+        log_rows = []
         for hid, name, target, created_ago in habit_ids:
             start = today - timedelta(days=created_ago)
             d = start
@@ -197,23 +439,22 @@ def _maybe_seed_demo_data(force: bool = False):
                 if random.random() < 0.07:
                     complete = not complete
                 if complete:
-                    conn.execute(
-                        'INSERT OR IGNORE INTO habit_log (habit_id, day, created_at) VALUES (?, ?, ?)',
-                        (hid, d.isoformat(), now.isoformat())
-                    )
+                    log_rows.append((hid, d.isoformat(), now.isoformat()))
                 d += timedelta(days=1)
+        conn.executemany(
+            'INSERT OR IGNORE INTO habit_log (habit_id, day, created_at) VALUES (?, ?, ?)', log_rows
+        )
 
         # Ideal self if empty
-        icount = conn.execute('SELECT COUNT(*) AS c FROM ideal_self').fetchone()['c']
-        if int(icount or 0) == 0:
-            conn.execute(
-                'INSERT INTO ideal_self (vision, focus_areas, created_at) VALUES (?, ?, ?)',
-                (
-                    'Disciplined, focused, strong. I keep my word, invest in long-term health and mastery, and lead with calm energy.',
-                    'Strength,Focus,Health,Learning,Family',
-                    now.isoformat(),
-                )
+        conn.execute(
+            'INSERT INTO ideal_self (id, vision, focus_areas, updated_at) VALUES (1, ?, ?, ?) '
+            'ON CONFLICT(id) DO NOTHING',
+            (
+                'Disciplined, focused, strong. I keep my word, invest in long-term health and mastery, and lead with calm energy.',
+                'Strength,Focus,Health,Learning,Family',
+                now.isoformat(),
             )
+        )
 
         # Journal entries (plentiful)
         phrases = [
@@ -229,17 +470,23 @@ def _maybe_seed_demo_data(force: bool = False):
             'Tracked meals and protein target.',
         ]
         entry_count = 150
+        entries = []
         for _ in range(entry_count):
             days_ago = random.randint(0, 120)
             ts = now - timedelta(days=days_ago, hours=random.randint(6, 23), minutes=random.randint(0, 59))
-            conn.execute(
-                'INSERT INTO journal_entry (content, timestamp) VALUES (?, ?)',
-                (random.choice(phrases), ts.isoformat())
-            )
+            entries.append((random.choice(phrases), ts.isoformat()))
+        conn.executemany(INSERT_JOURNAL_SQL, entries)
 
-        conn.commit()
-    finally:
-        conn.close()
+        # Seeded logs bypass the toggle path, so store their stats up front
+        _compute_habit_payloads(conn, conn.execute(HABITS_WITH_STATS_SQL).fetchall())
+
+        # Gather planner statistics once the tables hold rows so the indexes
+        # actually get chosen; ANALYZE on an empty schema records nothing.
+        has_stats = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        ).fetchone() and conn.execute('SELECT 1 FROM sqlite_stat1 LIMIT 1').fetchone()
+        if not has_stats:
+            conn.execute('ANALYZE')
 
 
 def _mirror_db_to_instance():
@@ -251,80 +498,223 @@ def _mirror_db_to_instance():
         instance_dir.mkdir(parents=True, exist_ok=True)
         target = instance_dir / 'habits_journal.db'
         if DB_PATH.exists():
-            shutil.copyfile(DB_PATH, target)
+            # Recent commits may still live in the WAL file, so copy through
+            # SQLite rather than the raw database file.
+            dest = sqlite3.connect(str(target))
+            try:
+                with _get_conn() as source:
+                    source.backup(dest)
+            finally:
+                dest.close()
     except Exception:
         # Best-effort mirror; ignore failures
         pass
 
 
-def _parse_datetime(value: str) -> datetime:
-    try:
-        return datetime.fromisoformat(value)
-    except ValueError:
-        return datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
-
+def _minute_label(timestamp: str) -> str:
+    # 'YYYY-MM-DDTHH:MM:SS...' -> 'YYYY-MM-DD HH:MM'
+    return f'{timestamp[:10]} {timestamp[11:16]}'
+
+
+# Consecutive days share the same julianday(day) - ROW_NUMBER() value, so each
+# group is one streak ("gaps and islands"). Every habit row comes back with its
+# log count, last logged day, longest streak and most recent streak attached,
+# so listing habits is a single query instead of one per habit.
+def _habit_stats_sql(log_filter='', habit_filter='', order=''):
+    return (
+        'WITH islands AS ('
+        ' SELECT habit_id, day,'
+        ' julianday(day) - ROW_NUMBER() OVER (PARTITION BY habit_id ORDER BY day) AS grp'
+        f' FROM habit_log {log_filter}'
+        '), runs AS ('
+        ' SELECT habit_id, COUNT(*) AS length, MAX(day) AS last_day'
+        ' FROM islands GROUP BY habit_id, grp'
+        '), stats AS ('
+        ' SELECT habit_id, SUM(length) AS log_count, MAX(last_day) AS last_log_day,'
+        ' MAX(length) AS longest_streak'
+        ' FROM runs GROUP BY habit_id'
+        ') '
+        'SELECT habit.*, COALESCE(stats.log_count, 0) AS log_count, stats.last_log_day,'
+        ' COALESCE(stats.longest_streak, 0) AS longest_streak,'
+        ' COALESCE(runs.length, 0) AS last_streak '
+        'FROM habit '
+        'LEFT JOIN stats ON stats.habit_id = habit.id '
+        'LEFT JOIN runs ON runs.habit_id = stats.habit_id AND runs.last_day = stats.last_log_day '
+        f'{habit_filter} {order}'
+    )
 
-def _compute_habit_payload(conn: sqlite3.Connection, row: sqlite3.Row) -> dict:
-    habit_id = row['id']
-    log_rows = conn.execute(
-        'SELECT day FROM habit_log WHERE habit_id = ? ORDER BY day ASC', (habit_id,)
-    ).fetchall()
-    log_days = [date.fromisoformat(r['day']) for r in log_rows]
-    log_set = set(log_days)
-    completed_days = len(log_days)
-    last_completed = log_days[-1] if log_days else None
 
+HABITS_WITH_STATS_SQL = _habit_stats_sql(order='ORDER BY habit.created_at DESC, habit.id')
+TIMELINE_HABITS_SQL = _habit_stats_sql(order='ORDER BY habit.created_at DESC, habit.id LIMIT ?')
+HABIT_WITH_STATS_SQL = _habit_stats_sql(
+    log_filter='WHERE habit_id = :id', habit_filter='WHERE habit.id = :id'
+)
+
+
+# One row per day from :start to :today with the running count of logs up to
+# that day. Each generated day probes habit_log's (habit_id, day) index once.
+PROGRESS_SQL = (
+    'WITH RECURSIVE window_day(day) AS ('
+    ' SELECT :start WHERE :start <= :today'
+    ' UNION ALL'
+    " SELECT date(day, '+1 day') FROM window_day WHERE day < :today"
+    ') '
+    'SELECT window_day.day, COUNT(habit_log.day) OVER (ORDER BY window_day.day) AS actual '
+    'FROM window_day '
+    'LEFT JOIN habit_log ON habit_log.habit_id = :id AND habit_log.day = window_day.day '
+    'ORDER BY window_day.day'
+)
+LAST_LOG_DAY_SQL = 'SELECT MAX(day) AS day FROM habit_log WHERE habit_id = ?'
+
+# Statements the request handlers run, kept as fixed strings so each pooled
+# connection's statement cache prepares them once and reuses the plan.
+HABIT_SQL = 'SELECT * FROM habit WHERE id = ?'
+INSERT_HABIT_SQL = (
+    'INSERT INTO habit (name, color, target_per_week, created_at, created_day) '
+    'VALUES (?, ?, ?, ?, ?)'
+)
+STORE_HABIT_STATS_SQL = (
+    'UPDATE habit SET score = ?, completed_days = ?, completed = ?, streak = ?, '
+    'best_streak = ?, last_completed = ? WHERE id = ?'
+)
+# Keyed by (color given, target given); parameters follow that order, then
+# the id. An unusable target is passed as NULL and keeps the stored one.
+UPDATE_HABIT_SQL = {
+    (False, False): HABIT_SQL,
+    (True, False): 'UPDATE habit SET color = ? WHERE id = ? RETURNING *',
+    (False, True): 'UPDATE habit SET target_per_week = COALESCE(?, target_per_week) WHERE id = ? RETURNING *',
+    (True, True): (
+        'UPDATE habit SET color = ?, target_per_week = COALESCE(?, target_per_week) '
+        'WHERE id = ? RETURNING *'
+    ),
+}
+LOG_DAY_SQL = (
+    f'INSERT INTO habit_log (habit_id, day, created_at) VALUES (?, ?, {SQL_NOW}) '
+    'ON CONFLICT(habit_id, day) DO NOTHING'
+)
+UNLOG_DAY_SQL = 'DELETE FROM habit_log WHERE habit_id = ? AND day = ?'
+JOURNAL_SQL = 'SELECT * FROM journal_entry ORDER BY timestamp DESC'
+TIMELINE_JOURNAL_SQL = 'SELECT timestamp, content FROM journal_entry ORDER BY timestamp DESC LIMIT ?'
+INSERT_JOURNAL_SQL = 'INSERT INTO journal_entry (content, timestamp) VALUES (?, ?)'
+IDEAL_SELF_SQL = 'SELECT vision, focus_areas FROM ideal_self WHERE id = 1'
+SAVE_IDEAL_SELF_SQL = (
+    f'INSERT INTO ideal_self (id, vision, focus_areas, updated_at) VALUES (1, ?, ?, {SQL_NOW}) '
+    'ON CONFLICT(id) DO UPDATE SET vision = excluded.vision, '
+    'focus_areas = excluded.focus_areas, updated_at = excluded.updated_at'
+)
+
+
+@lru_cache(maxsize=128)
+def _ideal_series(target_per_week: int, window: int) -> tuple:
+    # Depends only on the weekly target and the window length, both of which
+    # take few distinct values, so charts share the rounded series.
+    ideal_step = target_per_week / 7.0
+    return tuple(round(delta_days * ideal_step, 2) for delta_days in range(1, window + 1))
+
+
+def _fetch_habit(conn: sqlite3.Connection, habit_id: int):
+    return conn.execute(HABIT_WITH_STATS_SQL, {'id': habit_id}).fetchone()
+
+
+def _habit_payload(row: sqlite3.Row, completed_days: int, last_completed, streak: int,
+                   best_streak: int) -> dict:
+    # Day values stay ISO strings throughout: they compare correctly as text
+    # and go into the payload without a date round trip.
     today = date.today()
-    created_at = _parse_datetime(row['created_at'])
-    created_day = created_at.date()
-
-    # Streaks
-    current = 0
-    best = 0
-    prev_day = None
-    for log_day in log_days:
-        if prev_day is not None and (log_day - prev_day).days == 1:
-            current += 1
-        else:
-            current = 1
-        best = max(best, current)
-        prev_day = log_day
-    if log_days and (today - log_days[-1]).days > 1:
-        current = 0
-    if not log_days:
-        current = 0
-
-    total_days = max(1, (today - created_day).days + 1)
+    total_days = max(1, (today - date.fromisoformat(row['created_day'])).days + 1)
     score = round((completed_days / total_days) * 100.0, 1)
 
-    payload = {
-        'id': habit_id,
+    return {
+        'id': row['id'],
         'name': row['name'],
         'score': score,
         'completed_days': completed_days,
-        'created_at': created_at.isoformat(),
-        'completed': 1 if today in log_set else 0,
-        'streak': current,
-        'best_streak': max(best, row['best_streak'] or 0),
+        'created_at': row['created_at'],
+        'completed': last_completed == today.isoformat(),
+        'streak': streak,
+        'best_streak': max(best_streak, row['best_streak'] or 0),
         'color': row['color'] or DEFAULT_COLOR,
-        'target_per_week': _sanitize_target(row['target_per_week'], 7),
-        'last_completed': last_completed and last_completed.isoformat(),
+        'target_per_week': row['target_per_week'],
+        'last_completed': last_completed,
     }
 
-    conn.execute(
-        'UPDATE habit SET score = ?, completed_days = ?, completed = ?, streak = ?, '
-        'best_streak = ?, last_completed = ? WHERE id = ?',
-        (
-            payload['score'], payload['completed_days'], payload['completed'],
-            payload['streak'], payload['best_streak'], payload['last_completed'], habit_id,
-        ),
+
+def _store_habit_stats(conn: sqlite3.Connection, payloads):
+    conn.executemany(
+        STORE_HABIT_STATS_SQL,
+        [
+            (
+                p['score'], p['completed_days'], p['completed'],
+                p['streak'], p['best_streak'], p['last_completed'], p['id'],
+            )
+            for p in payloads
+        ],
     )
+
+
+def _derive_habit_payload(row: sqlite3.Row) -> dict:
+    last_completed = row['last_log_day']
+
+    # Streaks
+    current = 0
+    if last_completed and last_completed >= (date.today() - timedelta(days=1)).isoformat():
+        current = row['last_streak']
+
+    return _habit_payload(row, row['log_count'], last_completed, current, row['longest_streak'])
+
+
+def _compute_habit_payloads(conn: sqlite3.Connection, rows) -> list:
+    """Derive payloads for stats ``rows`` and store them in one batched
+    UPDATE and a single commit. Only write paths call this; reads use
+    ``_derive_habit_payload`` and never take the write lock.
+    """
+    payloads = [_derive_habit_payload(row) for row in rows]
+    _store_habit_stats(conn, payloads)
     conn.commit()
-    payload['completed'] = bool(payload['completed'])
+    return payloads
+
+
+def _stored_habit_payload(row: sqlite3.Row) -> dict:
+    """Build the payload from the stats stored on ``row``. Every log write
+    keeps them current, so only a streak broken by the date rolling over
+    needs adjusting; no log rows are read.
+    """
+    last_completed = row['last_completed']
+    streak = row['streak']
+    if not last_completed or last_completed < (date.today() - timedelta(days=1)).isoformat():
+        streak = 0
+    return _habit_payload(row, row['completed_days'], last_completed, streak, row['best_streak'])
+
+
+def _apply_toggle(conn: sqlite3.Connection, row: sqlite3.Row, added: bool) -> dict:
+    """Fold today's log being added or removed into the stored stats of ``row``
+    rather than recomputing them from the habit's whole log history.
+    """
+    today = date.today()
+    yesterday = (today - timedelta(days=1)).isoformat()
+    last_completed = row['last_completed']
+    streak = row['streak'] if last_completed and last_completed >= yesterday else 0
+    if added:
+        completed_days = row['completed_days'] + 1
+        streak = streak + 1 if last_completed == yesterday else 1
+        last_completed = today.isoformat()
+    else:
+        completed_days = max(0, row['completed_days'] - 1)
+        streak = max(0, streak - 1)
+        last_completed = conn.execute(LAST_LOG_DAY_SQL, (row['id'],)).fetchone()['day']
+
+    payload = _habit_payload(row, completed_days, last_completed, streak, streak)
+    _store_habit_stats(conn, [payload])
     return payload
 
 
 class AppHandler(SimpleHTTPRequestHandler):
+    # Keep connections open between the dashboard's API calls; every
+    # response carries a Content-Length or is chunked. Idle sockets are
+    # dropped after the timeout so they do not pin a server thread.
+    protocol_version = 'HTTP/1.1'
+    timeout = 30
+
     def __init__(self, *args, directory=None, **kwargs):
         super().__init__(*args, directory=directory or str(BASE_DIR), **kwargs)
 
@@ -338,7 +728,7 @@ class AppHandler(SimpleHTTPRequestHandler):
         elif parsed.path == '/api/habits':
             self._get_habits()
         elif parsed.path == '/api/timeline':
-            self._get_timeline()
+            self._get_timeline(parsed)
         elif parsed.path.startswith('/api/habits/') and parsed.path.endswith('/progress'):
             self._get_habit_progress(parsed)
         elif parsed.path == '/api/journal':
@@ -356,9 +746,14 @@ class AppHandler(SimpleHTTPRequestHandler):
             self._create_journal_entry()
         elif parsed.path == '/api/idealself':
             self._save_ideal_self()
+        elif parsed.path.startswith('/api/habits/') and parsed.path.endswith('/backfill'):
+            self._backfill_habit(parsed)
         elif parsed.path == '/api/demo/reset':
-            # Force-refresh the demo content
+            # Force-refresh the demo content. Any body is ignored, but it
+            # must be consumed before the connection serves the next request.
+            self._read_body()
             _maybe_seed_demo_data(force=True)
+            _mark_data_changed()
             self._respond_json({'status': 'ok', 'message': 'Demo data refreshed'})
         else:
             self.send_error(HTTPStatus.NOT_FOUND)
@@ -371,44 +766,94 @@ class AppHandler(SimpleHTTPRequestHandler):
             self.send_error(HTTPStatus.NOT_FOUND)
 
     def _serve_index(self):
-        index_path = TEMPLATES_DIR / 'index.html'
-        if not index_path.exists():
+        page = _index_page()
+        if page is None:
             self.send_error(HTTPStatus.NOT_FOUND)
             return
-        content = index_path.read_bytes()
+        content, compressed = page
         self.send_response(HTTPStatus.OK)
         self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Vary', 'Accept-Encoding')
+        if self._accepts_gzip():
+            content = compressed
+            self.send_header('Content-Encoding', 'gzip')
         self.send_header('Content-Length', str(len(content)))
         self.end_headers()
         self.wfile.write(content)
 
-    def _read_json(self):
+    def copyfile(self, source, outputfile):
+        # Static files go from the page cache straight to the socket with
+        # sendfile(2) rather than through Python-side read/write buffers.
+        # wfile is unbuffered, so the headers are already on the socket.
+        self.connection.sendfile(source)
+
+    def _read_body(self):
         length = int(self.headers.get('Content-Length', 0))
-        body = self.rfile.read(length) if length else b''
+        return self.rfile.read(length) if length else b''
+
+    def _read_json(self):
+        body = self._read_body()
         if not body:
             return {}
         try:
-            return json.loads(body.decode('utf-8'))
+            return _load_json(body)
         except json.JSONDecodeError:
             self.send_error(HTTPStatus.BAD_REQUEST, 'Invalid JSON payload')
             raise
 
-    def _respond_json(self, payload, status=HTTPStatus.OK):
-        data = json.dumps(payload).encode('utf-8')
+    def _respond_json(self, payload, status=HTTPStatus.OK, etag=None):
+        self._respond_bytes(_dump_json(payload), status=status, etag=etag)
+
+    def _respond_bytes(self, data, content_type='application/json; charset=utf-8',
+                       status=HTTPStatus.OK, etag=None, compressed=None):
+        # ``compressed`` is ``data`` already gzipped, when the caller has it
         self.send_response(status)
-        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Type', content_type)
+        if len(data) >= GZIP_MIN_SIZE:
+            self.send_header('Vary', 'Accept-Encoding')
+            if self._accepts_gzip():
+                data = compressed if compressed is not None else gzip.compress(data, compresslevel=1)
+                self.send_header('Content-Encoding', 'gzip')
         self.send_header('Content-Length', str(len(data)))
+        if etag:
+            self._send_cache_headers(etag)
         self.end_headers()
         self.wfile.write(data)
 
+    def _accepts_gzip(self):
+        return 'gzip' in self.headers.get('Accept-Encoding', '')
+
+    def _send_cache_headers(self, etag):
+        # Clients may keep the body but must revalidate it on every use
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+
+    def _respond_not_modified(self, etag):
+        """Answer with 304 when the client already holds ``etag``; returns
+        whether the request has been handled.
+        """
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        tags = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+        if '*' not in tags and etag.removeprefix('W/') not in tags:
+            return False
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self._send_cache_headers(etag)
+        self.end_headers()
+        return True
+
     def _get_habits(self):
-        conn = _connect()
-        try:
-            rows = conn.execute('SELECT * FROM habit ORDER BY datetime(created_at) DESC').fetchall()
-            habits = [_compute_habit_payload(conn, row) for row in rows]
-            self._respond_json(habits)
-        finally:
-            conn.close()
+        etag = _data_etag()
+        if self._respond_not_modified(etag):
+            return
+        cached = _cached_response('habits', etag)
+        if cached is None:
+            with _get_conn() as conn:
+                habits = [_derive_habit_payload(row) for row in conn.execute(HABITS_WITH_STATS_SQL)]
+            cached = _cache_response('habits', etag, _dump_json(habits))
+        data, compressed = cached
+        self._respond_bytes(data, etag=etag, compressed=compressed)
 
     def _create_habit(self):
         try:
@@ -421,19 +866,17 @@ class AppHandler(SimpleHTTPRequestHandler):
             return
         color = payload.get('color') or DEFAULT_COLOR
         target = _sanitize_target(payload.get('target_per_week', 7))
-        created_at = datetime.now().isoformat()
-        conn = _connect()
-        try:
+        created_at = datetime.now()
+        with _get_conn() as conn:
             cursor = conn.execute(
-                'INSERT INTO habit (name, color, target_per_week, created_at) VALUES (?, ?, ?, ?)',
-                (name, color, target, created_at)
+                INSERT_HABIT_SQL,
+                (name, color, target, created_at.isoformat(), created_at.date().isoformat())
             )
             conn.commit()
+            _mark_data_changed()
             habit_id = cursor.lastrowid
-            row = conn.execute('SELECT * FROM habit WHERE id = ?', (habit_id,)).fetchone()
-            self._respond_json(_compute_habit_payload(conn, row), status=HTTPStatus.CREATED)
-        finally:
-            conn.close()
+            row = conn.execute(HABIT_SQL, (habit_id,)).fetchone()
+            self._respond_json(_stored_habit_payload(row), status=HTTPStatus.CREATED)
 
     def _update_habit(self, parsed):
         parts = parsed.path.strip('/').split('/')
@@ -450,45 +893,96 @@ class AppHandler(SimpleHTTPRequestHandler):
         except json.JSONDecodeError:
             return
 
-        conn = _connect()
+        has_color = 'color' in payload
+        has_target = 'target_per_week' in payload
+        params = []
+        if has_color:
+            params.append(payload['color'] or DEFAULT_COLOR)
+        if has_target:
+            params.append(_sanitize_target(payload['target_per_week'], None))
+        params.append(habit_id)
+
+        with _get_conn() as conn:
+            # One transaction: the row comes back from the UPDATE itself when
+            # there is one, and the toggle's stats are written before commit.
+            # The write lock is taken up front so the stored stats read here
+            # cannot be overtaken by a concurrent toggle before they are updated.
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute(UPDATE_HABIT_SQL[has_color, has_target], params).fetchone()
+                # A missing habit is answered after the write lock is released
+                habit_payload = None
+                if row is not None:
+                    toggled = None
+                    if 'completed' in payload:
+                        # Let the UNIQUE(habit_id, day) index decide whether anything
+                        # changed; rowcount tells us if the toggle actually happened.
+                        today_str = date.today().isoformat()
+                        if payload['completed']:
+                            cursor = conn.execute(LOG_DAY_SQL, (habit_id, today_str))
+                        else:
+                            cursor = conn.execute(UNLOG_DAY_SQL, (habit_id, today_str))
+                        if cursor.rowcount:
+                            toggled = bool(payload['completed'])
+
+                    # Neither branch rescans the habit's logs: a toggle is folded into
+                    # the stored stats, anything else leaves them as they are.
+                    if toggled is None:
+                        habit_payload = _stored_habit_payload(row)
+                    else:
+                        habit_payload = _apply_toggle(conn, row, toggled)
+        if habit_payload is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        _mark_data_changed()
+        self._respond_json(habit_payload)
+
+    def _backfill_habit(self, parsed):
+        parts = parsed.path.strip('/').split('/')
+        if len(parts) < 3:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        try:
+            habit_id = int(parts[2])
+        except ValueError:
+            self.send_error(HTTPStatus.BAD_REQUEST, 'Invalid habit id')
+            return
         try:
-            row = conn.execute('SELECT * FROM habit WHERE id = ?', (habit_id,)).fetchone()
+            payload = self._read_json()
+        except json.JSONDecodeError:
+            return
+        # Either a bare list of days or {"days": [...]}
+        days = payload.get('days') if isinstance(payload, dict) else payload
+        if not isinstance(days, list):
+            self.send_error(HTTPStatus.BAD_REQUEST, 'A list of days is required')
+            return
+        try:
+            # Canonical ISO strings order and compare like the dates they name
+            log_days = sorted({date.fromisoformat(day).isoformat() for day in days})
+        except (TypeError, ValueError):
+            self.send_error(HTTPStatus.BAD_REQUEST, 'Days must be YYYY-MM-DD dates')
+            return
+
+        with _get_conn() as conn:
+            row = conn.execute(HABIT_SQL, (habit_id,)).fetchone()
             if row is None:
                 self.send_error(HTTPStatus.NOT_FOUND)
                 return
+            if log_days and (log_days[0] < row['created_day'] or log_days[-1] > date.today().isoformat()):
+                self.send_error(HTTPStatus.BAD_REQUEST, 'Days must fall between the habit creation and today')
+                return
 
-            updates = []
-            params = []
-            if 'color' in payload:
-                updates.append('color = ?')
-                params.append(payload['color'] or DEFAULT_COLOR)
-            if 'target_per_week' in payload:
-                updates.append('target_per_week = ?')
-                params.append(_sanitize_target(payload['target_per_week'], row['target_per_week']))
-
-            if updates:
-                params.append(habit_id)
-                conn.execute(f'UPDATE habit SET {", ".join(updates)} WHERE id = ?', params)
-
-            if 'completed' in payload:
-                today_str = date.today().isoformat()
-                existing = conn.execute(
-                    'SELECT id FROM habit_log WHERE habit_id = ? AND day = ?', (habit_id, today_str)
-                ).fetchone()
-                if payload['completed'] and existing is None:
-                    conn.execute(
-                        'INSERT INTO habit_log (habit_id, day, created_at) VALUES (?, ?, ?)',
-                        (habit_id, today_str, datetime.now().isoformat())
-                    )
-                elif not payload['completed'] and existing is not None:
-                    conn.execute('DELETE FROM habit_log WHERE id = ?', (existing['id'],))
-
-            conn.commit()
-            updated_row = conn.execute('SELECT * FROM habit WHERE id = ?', (habit_id,)).fetchone()
-            habit_payload = _compute_habit_payload(conn, updated_row)
+            # One transaction (and one fsync) for the whole batch. The stats
+            # are recomputed under the same write lock, so a toggle landing
+            # in between cannot be overwritten by a stale recompute.
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany(LOG_DAY_SQL, [(habit_id, day) for day in log_days])
+                # Past days can join or split streaks anywhere, so recompute in full
+                habit_payload = _derive_habit_payload(_fetch_habit(conn, habit_id))
+                _store_habit_stats(conn, [habit_payload])
+            _mark_data_changed()
             self._respond_json(habit_payload)
-        finally:
-            conn.close()
 
     def _get_habit_progress(self, parsed):
         parts = parsed.path.strip('/').split('/')
@@ -507,49 +1001,24 @@ class AppHandler(SimpleHTTPRequestHandler):
         except (TypeError, ValueError):
             days = 30
 
-        conn = _connect()
-        try:
-            row = conn.execute('SELECT * FROM habit WHERE id = ?', (habit_id,)).fetchone()
+        with _get_conn() as conn:
+            row = conn.execute(HABIT_SQL, (habit_id,)).fetchone()
             if row is None:
                 self.send_error(HTTPStatus.NOT_FOUND)
                 return
-            created_at = _parse_datetime(row['created_at'])
-            created_day = created_at.date()
             today = date.today()
             range_start = today - timedelta(days=days - 1)
-            start_day = max(range_start, created_day)
-
-            log_rows = conn.execute(
-                'SELECT day FROM habit_log WHERE habit_id = ? ORDER BY day ASC', (habit_id,)
-            ).fetchall()
-            log_days = [date.fromisoformat(r['day']) for r in log_rows]
-            log_set = set(log_days)
-
-            cumulative_actual = {}
-            count = 0
-            cursor = created_day
-            while cursor <= today:
-                if cursor in log_set:
-                    count += 1
-                cumulative_actual[cursor] = count
-                cursor += timedelta(days=1)
-
-            dates = []
-            actual_series = []
-            ideal_series = []
-            ideal_step = (row['target_per_week'] or 7) / 7.0
-
-            baseline_day = start_day - timedelta(days=1)
-            baseline = cumulative_actual.get(baseline_day, 0)
-
-            current_day = start_day
-            while current_day <= today:
-                dates.append(current_day.isoformat())
-                actual_value = max(0, cumulative_actual.get(current_day, 0) - baseline)
-                actual_series.append(actual_value)
-                delta_days = (current_day - start_day).days + 1
-                ideal_series.append(round(max(0, delta_days) * ideal_step, 2))
-                current_day += timedelta(days=1)
+            start_day = max(range_start.isoformat(), row['created_day'])
+
+            # Only the visible window matters: the actual series counts logs
+            # from start_day onward, and SQLite generates the days and the
+            # running count in one pass.
+            progress = conn.execute(PROGRESS_SQL, {
+                'id': habit_id, 'start': start_day, 'today': today.isoformat(),
+            }).fetchall()
+            dates = [progress_row['day'] for progress_row in progress]
+            actual_series = [progress_row['actual'] for progress_row in progress]
+            ideal_series = list(_ideal_series(row['target_per_week'] or 7, len(progress)))
 
             self._respond_json({
                 'habit': {
@@ -562,58 +1031,118 @@ class AppHandler(SimpleHTTPRequestHandler):
                 'ideal': ideal_series,
                 'actual': actual_series,
             })
-        finally:
-            conn.close()
 
-    def _get_timeline(self):
-        conn = _connect()
+    def _get_timeline(self, parsed):
+        query = parse_qs(parsed.query)
+        try:
+            limit = min(max(1, int(query.get('limit', ['100'])[0])), MAX_TIMELINE_LIMIT)
+        except (TypeError, ValueError):
+            limit = 100
+        # offset + limit feeds both islice and SQLite's 64-bit LIMIT
         try:
-            items = []
-            for row in conn.execute('SELECT * FROM habit'):
-                created_at = _parse_datetime(row['created_at'])
-                payload = _compute_habit_payload(conn, row)
-                entry = (
-                    created_at,
-                    f"HABIT: {payload['name']} | Score: {payload['score']:.1f}% | "
-                    f"Streak: {payload['streak']} | Days: {payload['completed_days']} | "
-                    f"Created: {created_at.strftime('%Y-%m-%d %H:%M')}"
-                )
-                if payload['last_completed']:
-                    entry = (
-                        entry[0],
-                        entry[1] + f" | Last done: {datetime.fromisoformat(payload['last_completed']).strftime('%Y-%m-%d %H:%M')}"
+            offset = min(max(0, int(query.get('offset', ['0'])[0])), sys.maxsize - limit)
+        except (TypeError, ValueError):
+            offset = 0
+
+        etag = _data_etag()
+        if self._respond_not_modified(etag):
+            return
+        # Not held in the response cache: the page is streamed and never
+        # assembled in memory, and clients revalidate it through the ETag.
+        with _get_conn() as conn:
+            # Both sources come back newest-first and capped at the end of the
+            # requested page, so merging them yields the page without sorting.
+            fetch = offset + limit
+            # Stored timestamps are ISO strings, so they serve as merge keys
+            # and are sliced into labels without being parsed.
+            # The page usually ends before either cursor is exhausted; both are
+            # closed below so no read statement outlives the request.
+            habit_rows = conn.execute(TIMELINE_HABITS_SQL, (fetch,))
+            journal_rows = conn.execute(TIMELINE_JOURNAL_SQL, (fetch,))
+
+            def habit_items():
+                for row in habit_rows:
+                    payload = _derive_habit_payload(row)
+                    line = (
+                        f"HABIT: {payload['name']} | Score: {payload['score']:.1f}% | "
+                        f"Streak: {payload['streak']} | Days: {payload['completed_days']} | "
+                        f"Created: {_minute_label(row['created_at'])}"
                     )
-                items.append(entry)
-            for row in conn.execute('SELECT * FROM journal_entry'):
-                timestamp = _parse_datetime(row['timestamp'])
-                items.append((timestamp, f"JOURNAL [{timestamp.strftime('%Y-%m-%d %H:%M')}]: {row['content']}"))
-
-            items.sort(key=lambda item: item[0], reverse=True)
-            timeline = '\n\n'.join(item[1] for item in items)
-            data = timeline.encode('utf-8')
-            self.send_response(HTTPStatus.OK)
-            self.send_header('Content-Type', 'text/plain; charset=utf-8')
-            self.send_header('Content-Length', str(len(data)))
-            self.end_headers()
-            self.wfile.write(data)
-        finally:
-            conn.close()
+                    if payload['last_completed']:
+                        line += f" | Last done: {payload['last_completed']} 00:00"
+                    yield row['created_at'], line
+
+            def journal_items():
+                for row in journal_rows:
+                    yield row['timestamp'], f"JOURNAL [{_minute_label(row['timestamp'])}]: {row['content']}"
+
+            try:
+                merged = heapq.merge(habit_items(), journal_items(), key=itemgetter(0), reverse=True)
+                # Stream entries as they come off the merge. HTTP/1.1 clients get
+                # a chunked body; older ones read until the connection closes.
+                chunked = self.request_version != 'HTTP/1.0'
+                compressor = zlib.compressobj(1, zlib.DEFLATED, 31) if self._accepts_gzip() else None
+                self.send_response(HTTPStatus.OK)
+                self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                self.send_header('Vary', 'Accept-Encoding')
+                if compressor:
+                    self.send_header('Content-Encoding', 'gzip')
+                if chunked:
+                    self.send_header('Transfer-Encoding', 'chunked')
+                else:
+                    self.close_connection = True
+                self._send_cache_headers(etag)
+                self.end_headers()
+
+                def write(data):
+                    # An empty chunk would end the body early
+                    if not data:
+                        return
+                    if chunked:
+                        data = b'%X\r\n%s\r\n' % (len(data), data)
+                    self.wfile.write(data)
+
+                # Lines are sent in batches of about STREAM_BATCH_SIZE bytes: one
+                # write per batch instead of one per line, and only the current
+                # batch is held in memory.
+                batch = []
+                batch_size = 0
+                for index, (_, line) in enumerate(islice(merged, offset, fetch)):
+                    chunk = (f'\n\n{line}' if index else line).encode('utf-8')
+                    batch.append(chunk)
+                    batch_size += len(chunk)
+                    if batch_size >= STREAM_BATCH_SIZE:
+                        data = b''.join(batch)
+                        write(compressor.compress(data) if compressor else data)
+                        batch.clear()
+                        batch_size = 0
+                data = b''.join(batch)
+                write(compressor.compress(data) + compressor.flush() if compressor else data)
+                if chunked:
+                    self.wfile.write(b'0\r\n\r\n')
+            finally:
+                habit_rows.close()
+                journal_rows.close()
 
     def _get_journal(self):
-        conn = _connect()
-        try:
-            rows = conn.execute('SELECT * FROM journal_entry ORDER BY datetime(timestamp) DESC').fetchall()
-            entries = [
-                {
-                    'id': row['id'],
-                    'content': row['content'],
-                    'timestamp': _parse_datetime(row['timestamp']).isoformat(),
-                }
-                for row in rows
-            ]
-            self._respond_json(entries)
-        finally:
-            conn.close()
+        etag = _data_etag()
+        if self._respond_not_modified(etag):
+            return
+        cached = _cached_response('journal', etag)
+        if cached is None:
+            with _get_conn() as conn:
+                rows = conn.execute(JOURNAL_SQL)
+                entries = [
+                    {
+                        'id': row['id'],
+                        'content': row['content'],
+                        'timestamp': row['timestamp'],
+                    }
+                    for row in rows
+                ]
+            cached = _cache_response('journal', etag, _dump_json(entries))
+        data, compressed = cached
+        self._respond_bytes(data, etag=etag, compressed=compressed)
 
     def _create_journal_entry(self):
         try:
@@ -625,31 +1154,21 @@ class AppHandler(SimpleHTTPRequestHandler):
             self.send_error(HTTPStatus.BAD_REQUEST, 'Journal content is required')
             return
         timestamp = datetime.now().isoformat()
-        conn = _connect()
-        try:
-            cursor = conn.execute(
-                'INSERT INTO journal_entry (content, timestamp) VALUES (?, ?)',
-                (content, timestamp)
-            )
+        with _get_conn() as conn:
+            cursor = conn.execute(INSERT_JOURNAL_SQL, (content, timestamp))
             conn.commit()
+            _mark_data_changed()
             entry_id = cursor.lastrowid
             self._respond_json({'id': entry_id, 'content': content, 'timestamp': timestamp}, status=HTTPStatus.CREATED)
-        finally:
-            conn.close()
 
     def _get_ideal_self(self):
-        conn = _connect()
-        try:
-            row = conn.execute(
-                'SELECT vision, focus_areas FROM ideal_self ORDER BY datetime(created_at) DESC LIMIT 1'
-            ).fetchone()
+        with _get_conn() as conn:
+            row = conn.execute(IDEAL_SELF_SQL).fetchone()
             if row is None:
                 self._respond_json({'vision': '', 'focus_areas': []})
                 return
             focus = [item.strip() for item in (row['focus_areas'] or '').split(',') if item.strip()]
             self._respond_json({'vision': row['vision'] or '', 'focus_areas': focus})
-        finally:
-            conn.close()
 
     def _save_ideal_self(self):
         try:
@@ -661,25 +1180,26 @@ class AppHandler(SimpleHTTPRequestHandler):
         if isinstance(focus_areas, str):
             focus_areas = [focus_areas]
         focus_clean = ','.join(item.strip() for item in focus_areas if item and item.strip())
-        conn = _connect()
-        try:
-            conn.execute(
-                'INSERT INTO ideal_self (vision, focus_areas, created_at) VALUES (?, ?, ?)',
-                (vision, focus_clean, datetime.now().isoformat())
-            )
+        with _get_conn() as conn:
+            conn.execute(SAVE_IDEAL_SELF_SQL, (vision, focus_clean))
             conn.commit()
             self._respond_json({'vision': vision, 'focus_areas': focus_clean.split(',') if focus_clean else []})
-        finally:
-            conn.close()
+
+
+class AppServer(ThreadingHTTPServer):
+    # socketserver's default listen backlog of 5 makes the kernel refuse
+    # connections when a dashboard load fires its API calls in parallel
+    request_queue_size = 128
 
 
 def run(port=8010):
+    _pool.fill()
     _ensure_schema()
     # Force seeding each start to ensure demo data is visible
     _maybe_seed_demo_data(force=True)
     _mirror_db_to_instance()
     handler = partial(AppHandler, directory=str(BASE_DIR))
-    with ThreadingHTTPServer(('0.0.0.0', port), handler) as httpd:
+    with AppServer(('0.0.0.0', port), handler) as httpd:
         print(f"Serving on http://0.0.0.0:{port}")
         try:
             httpd.serve_forever()